@@ -3,16 +3,18 @@
 use crate::storage::STORAGE_PATH;
 use lazy_static::lazy_static;
 use sha2::{Digest, Sha256};
-use std::{fs, path::PathBuf};
+use std::{env::var, fs, path::PathBuf};
 use tokio::process::Command as TokioCommand;
 
 lazy_static! {
     // This is the directory where the files can be read and written to
-    pub static ref MOUNT_PATH: PathBuf = PathBuf::from("/tmp/tdx-identity-persist");
+    pub static ref MOUNT_PATH: PathBuf =
+        PathBuf::from(var("MOUNT_PATH").unwrap_or("/tmp/tdx-identity-persist".to_string()));
     // This is where the files are actually stored on disk
     static ref ENCRYPTED_PATH: PathBuf = STORAGE_PATH.join("tdx-store-encrypted");
     // A temporary file to store the encryption key for use by gocryptfs
-    static ref KEY_PATH: PathBuf = PathBuf::from("/tmp/gocryptfs.key");
+    static ref KEY_PATH: PathBuf =
+        PathBuf::from(var("GOCRYPTFS_KEY_PATH").unwrap_or("/tmp/gocryptfs.key".to_string()));
 }
 
 /// Mounts a virtual storage directory in tmp that mirrors encrypted files to $STORAGE_PATH
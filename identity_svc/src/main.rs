@@ -1,5 +1,5 @@
 use crate::{handlers::create_router, state::AppState};
-use std::sync::Arc;
+use std::{env::var, sync::Arc};
 use tokio::net::TcpListener;
 
 mod encryption;
@@ -16,7 +16,10 @@ mod workload;
 async fn main() {
     let state = AppState::new().await.expect("Failed to initialize state");
     let app = create_router(Arc::new(state));
-    println!("Starting server on 0.0.0.0:3001");
-    let listener = TcpListener::bind("0.0.0.0:3001").await.unwrap();
+    let port = var("IDENTITY_PORT").unwrap_or("3001".to_string());
+    println!("Starting server on 0.0.0.0:{}", port);
+    let listener = TcpListener::bind(format!("0.0.0.0:{}", port))
+        .await
+        .unwrap();
     axum::serve(listener, app).await.unwrap();
 }
@@ -8,12 +8,13 @@
 use crate::workload::{CONTAINER_NAME, PODMAN_SOCKET_PATH};
 use async_trait::async_trait;
 use ed25519_dalek::{VerifyingKey, PUBLIC_KEY_LENGTH};
+use lazy_static::lazy_static;
 use russh::{
     server::{run_stream, Auth, Config, Msg, Session},
     Channel, ChannelId, CryptoVec, MethodSet,
 };
 use russh_keys::key::{KeyPair, PublicKey};
-use std::{process::Stdio, sync::Arc};
+use std::{env::var, process::Stdio, sync::Arc};
 use std::{sync::OnceLock, time::Duration};
 use tokio::{
     io::{AsyncReadExt, AsyncWriteExt},
@@ -24,7 +25,13 @@ use tokio::{
 
 /// Global shutdown signal sender for gracefully stopping the SSH server
 static SHUTDOWN: OnceLock<broadcast::Sender<()>> = OnceLock::new();
-const SSH_PORT: u16 = 2222;
+
+lazy_static! {
+    /// Port the SSH server listens on
+    static ref SSH_PORT: u16 = var("SSH_PORT")
+        .map(|port| port.parse().expect("Invalid SSH_PORT"))
+        .unwrap_or(2222);
+}
 
 /// Starts the SSH server with the specified Ed25519 public key for authentication.
 ///
@@ -52,10 +59,10 @@ pub async fn start_ssh_server(key: &[u8; PUBLIC_KEY_LENGTH]) {
     let _ = SHUTDOWN.get_or_init(|| tx);
 
     // Bind the server to the specified port
-    let listener = TcpListener::bind(("0.0.0.0", SSH_PORT))
+    let listener = TcpListener::bind(("0.0.0.0", *SSH_PORT))
         .await
         .expect("Failed to bind port");
-    println!("SSH server started on port {SSH_PORT}");
+    println!("SSH server started on port {}", *SSH_PORT);
 
     // Spawn the server loop in the background
     tokio::spawn(handle_incoming_connections(listener, pubkey, rx));
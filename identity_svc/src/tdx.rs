@@ -7,6 +7,8 @@ use std::{env::var, path::Path};
 lazy_static! {
     static ref MOCK_TDX_URL: String = var("MOCK_TDX_URL")
         .unwrap_or_else(|_| { "http://ns31695324.ip-141-94-163.eu:10080".to_string() });
+    /// Whether to use the mock TDX service even if TDX is available
+    static ref MOCK_ATTESTATION: bool = var("MOCK_ATTESTATION").is_ok();
 }
 
 /// Creates a TDX quote for the given report data.
@@ -35,7 +37,7 @@ pub async fn create_tdx_quote(report_data: [u8; 64]) -> Result<Vec<u8>> {
     Ok(response_bytes.to_vec())
 }
 
-/// Returns true if the TDX configfs subsystem is available.
+/// Returns true if the TDX configfs subsystem is available and attestation is not mocked.
 pub fn is_tdx_available() -> bool {
-    Path::new("/sys/kernel/config/tsm/report").exists()
+    !*MOCK_ATTESTATION && Path::new("/sys/kernel/config/tsm/report").exists()
 }
@@ -13,6 +13,7 @@ use podman_api::{
     Podman,
 };
 use std::{
+    env::var,
     fs,
     io::ErrorKind,
     path::{Component, Path, PathBuf},
@@ -26,6 +27,10 @@ lazy_static! {
     /// Directories in the container are persisted via bind mounts to this folder
     static ref CONTAINER_PERSIST_DIR: PathBuf = MOUNT_PATH.join("podman");
     static ref PODMAN: Podman = Podman::unix(PODMAN_SOCKET_PATH);
+    /// Host port the workload port is mapped to once finalized
+    static ref WORKLOAD_PORT: u16 = var("WORKLOAD_PORT")
+        .map(|port| port.parse().expect("Invalid WORKLOAD_PORT"))
+        .unwrap_or(8080);
 }
 
 /// Runs a workload container with the specified configuration
@@ -74,7 +79,7 @@ pub async fn run_container(config: &WorkloadConfig) -> Result<()> {
     let port_mappings = if config.finalized {
         vec![PortMapping {
             container_port: Some(config.port),
-            host_port: Some(8080),
+            host_port: Some(*WORKLOAD_PORT),
             protocol: Some("tcp".to_string()),
             host_ip: None,
             range: None,
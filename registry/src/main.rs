@@ -3,7 +3,7 @@ use axum::{
     Router,
 };
 use state::AppState;
-use std::sync::Arc;
+use std::{env::var, sync::Arc};
 use tokio::net::TcpListener;
 
 mod error;
@@ -21,7 +21,10 @@ async fn main() {
         .route("/instance/:pubkey", get(handlers::get_instance))
         .with_state(Arc::new(state));
 
-    println!("Starting server on 0.0.0.0:3000");
-    let listener = TcpListener::bind("0.0.0.0:3000").await.unwrap();
+    let port = var("REGISTRY_PORT").unwrap_or("3000".to_string());
+    println!("Starting server on 0.0.0.0:{}", port);
+    let listener = TcpListener::bind(format!("0.0.0.0:{}", port))
+        .await
+        .unwrap();
     axum::serve(listener, app).await.unwrap();
 }
@@ -1,42 +1,101 @@
+"""Shared fixtures for the integration tests
+
+Service state is kept under $TDX_TEST_STATE_DIR (default /dev/shm) so restarts
+never touch a block device. CI runners without /dev/shm should mount a tmpfs
+at a stable path and point TDX_TEST_STATE_DIR at it.
+"""
 import os
+import subprocess
 import time
 import pytest
+from collections import deque
+import requests
 import paramiko
-from pathlib import Path
 from base64 import b64encode
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import serialization
-from .utils.server_manager import ServerManager
+from .utils.server_manager import ServerManager, wait_for_http
+from .utils.ssh import connect_with_retry, tcp_ssh_ready
 from .utils.api_client import ApiClient
 from .utils.workload import WorkloadManager
 
-@pytest.fixture
-def servers():
+def pytest_sessionstart(session):
+    # Build once in the main process, xdist workers only locate the binaries
+    if 'PYTEST_XDIST_WORKER' in os.environ or session.config.option.collectonly:
+        return
+    try:
+        ServerManager.build()
+    except subprocess.CalledProcessError as e:
+        pytest.exit(f"cargo build failed with exit code {e.returncode}", returncode=e.returncode)
+
+def pytest_runtest_setup(item):
+    if item.get_closest_marker('real_tdx'):
+        pytest.skip("The test servers always run with mocked attestation")
+
+@pytest.fixture(scope="session")
+def built_binaries():
+    """Paths to the service binaries built in pytest_sessionstart"""
+    ServerManager.locate()
+    for path in [ServerManager.registry_bin, ServerManager.identity_bin]:
+        if not os.path.isfile(path):
+            pytest.fail(f"Service binary {path} not found, run cargo build --release")
+    return ServerManager.registry_bin, ServerManager.identity_bin
+
+@pytest.fixture(scope="session")
+def servers(built_binaries):
     manager = ServerManager()
     yield manager
     manager.stop()
 
-@pytest.fixture
-def api():
-    return ApiClient()
+@pytest.fixture(autouse=True)
+def _reset(request, servers):
+    """Gives tests marked needs_restart clean state, everything else shares the running servers"""
+    if request.node.get_closest_marker('needs_restart'):
+        servers.reset_state()
+    else:
+        servers.start()
+    yield
+    # Whatever the test did, the state is no longer known to be empty
+    servers.clean_generation = None
 
-@pytest.fixture
-def workload():
-    return WorkloadManager()
+@pytest.fixture(scope="session")
+def api(servers):
+    return ApiClient(servers.identity_url, servers.registry_url)
+
+@pytest.fixture(scope="session")
+def http():
+    """Shared session for requests made directly to the workload"""
+    with requests.Session() as session:
+        yield session
+
+@pytest.fixture(scope="session")
+def workload(servers):
+    return WorkloadManager(servers.mount_path)
+
+KEY_POOL_SIZE = 64
+
+@pytest.fixture(scope="session")
+def _key_pool():
+    """Pre-generated Ed25519 keys handed out one per fixture use"""
+    return deque(ed25519.Ed25519PrivateKey.generate() for _ in range(KEY_POOL_SIZE))
+
+def _take_key(pool: deque) -> ed25519.Ed25519PrivateKey:
+    return pool.popleft() if pool else ed25519.Ed25519PrivateKey.generate()
 
 @pytest.fixture
-def operator_key():
-    return ed25519.Ed25519PrivateKey.generate()
+def operator_key(_key_pool):
+    return _take_key(_key_pool)
 
 @pytest.fixture
-def owner_key():
-    return ed25519.Ed25519PrivateKey.generate()
+def owner_key(_key_pool):
+    return _take_key(_key_pool)
 
 @pytest.fixture
-def registered_environment(servers, api, operator_key, owner_key):
-    """Sets up a complete test environment with servers running and owner registered"""
-    servers.start()
-    
+def other_key(_key_pool):
+    """A key unrelated to operator_key and owner_key"""
+    return _take_key(_key_pool)
+
+def _register(api, operator_key, owner_key):
     # Get instance pubkey after servers are started
     instance_pubkey = api.get_instance_pubkey()
     
@@ -51,7 +110,64 @@ def registered_environment(servers, api, operator_key, owner_key):
         'owner_token': owner_token
     }
 
+@pytest.fixture(scope="session")
+def _session_registered():
+    """Registration shared by registered_environment, with the servers generation it belongs to"""
+    return {}
+
+@pytest.fixture
+def registered_environment(servers, api, _session_registered, _key_pool):
+    """Sets up a complete test environment with servers running and owner registered
+
+    The registration is reused until the servers restart, along with anything
+    earlier tests persisted on it. Rejected workload configs are stored before
+    validation fails, so after test_directory_traversal_prevention the instance
+    holds a traversal config. Tests that need an instance with no workload
+    configured should use fresh_environment instead
+    """
+    if _session_registered.get('generation') != servers.generation:
+        servers.ensure_clean()
+        _session_registered['env'] = _register(api, _take_key(_key_pool), _take_key(_key_pool))
+        _session_registered['generation'] = servers.generation
+    return _session_registered['env']
+
 @pytest.fixture
-def ssh_key_path(tmp_path: Path, owner_key):
-    """Create SSH key files and return path to private key"""
-    return WorkloadManager.setup_ssh_config(tmp_path, owner_key)
+def fresh_environment(servers, api, operator_key, owner_key):
+    """Sets up a complete test environment on freshly reset servers"""
+    servers.ensure_clean()
+    return _register(api, operator_key, owner_key)
+
+@pytest.fixture(scope="module")
+def running_workload(servers, api, workload, http, _key_pool, tmp_path_factory):
+    """Configures and exposes the nginx workload once per module
+
+    Tests using this must not be marked needs_restart, since that would wipe the workload
+    """
+    servers.reset_state()
+    owner_key = _take_key(_key_pool)
+    env = _register(api, _take_key(_key_pool), owner_key)
+    instance_pubkey = env['instance_pubkey']
+    ssh_key_path = WorkloadManager.setup_ssh_config(tmp_path_factory.mktemp('ssh'), owner_key)
+
+    # Configure and start workload
+    api.configure_workload(owner_key, workload.get_default_config(instance_pubkey))
+
+    # SSH is only available until the workload is exposed
+    # Wait on the cheap banner check, then log in once with the owner key
+    ssh_connected = (
+        tcp_ssh_ready(port=servers.ssh_port)
+        and connect_with_retry(ssh_key_path, port=servers.ssh_port, max_retries=1)
+    )
+
+    # Configure and expose nginx, then wait for it to serve requests
+    workload.configure_nginx()
+    api.expose_workload(owner_key, workload.get_expose_config(instance_pubkey))
+    custom_url = f'http://localhost:{servers.workload_port}/custom'
+    wait_for_http(custom_url, timeout=30, session=http)
+
+    yield {
+        **env,
+        'ssh_key_path': ssh_key_path,
+        'ssh_connected': ssh_connected,
+        'custom_url': custom_url
+    }
@@ -1,7 +1,8 @@
-def test_basic_registration_flow(servers, api, operator_key, owner_key):
+import pytest
+
+@pytest.mark.needs_restart
+def test_basic_registration_flow(api, operator_key, owner_key):
     """Test the basic registration flow: operator -> owner -> workload"""
-    servers.start()
-    
     instance_pubkey = api.get_instance_pubkey()
     
     # Register operator and owner
@@ -13,10 +14,10 @@ def test_basic_registration_flow(servers, api, operator_key, owner_key):
     assert 'operator' in data
     assert 'owner' in data
 
+@pytest.mark.needs_restart
+@pytest.mark.xdist_group("serial")
 def test_persistence(servers, api, operator_key, owner_key):
     """Test that state persists across server restarts"""
-    servers.start()
-    
     instance_pubkey = api.get_instance_pubkey()
     
     # Initial registration
@@ -24,8 +25,7 @@ def test_persistence(servers, api, operator_key, owner_key):
     api.register_owner(instance_pubkey, owner_key, owner_token)
 
     # Restart servers without clearing state
-    servers.stop()
-    servers.start(reset_state=False)
+    servers.restart(reset_state=False)
     
     # Verify state persisted
     new_pubkey = api.get_instance_pubkey()
@@ -1,18 +1,16 @@
-from cryptography.hazmat.primitives.asymmetric import ed25519
 import pytest
 import requests
 
-def test_double_operator_registration(servers, api, operator_key):
+@pytest.mark.needs_restart
+def test_double_operator_registration(api, operator_key, other_key):
     """Test that operator can't be registered twice"""
-    servers.start()
-    
     instance_pubkey = api.get_instance_pubkey()
     
     # First registration should succeed
     api.register_operator(instance_pubkey, operator_key)
     
     # Second registration should fail
-    new_operator_key = ed25519.Ed25519PrivateKey.generate()
+    new_operator_key = other_key
     with pytest.raises(requests.exceptions.HTTPError) as exc_info:
         api.register_operator(instance_pubkey, new_operator_key)
     assert exc_info.value.response.status_code == 400
@@ -36,10 +34,10 @@ def test_workload_validation(registered_environment, api, workload):
         api.configure_workload(owner_key, invalid_config)
     assert exc_info.value.response.status_code == 400
 
-def test_expose_before_configure(registered_environment, api, workload):
+def test_expose_before_configure(fresh_environment, api, workload):
     """Test that workload exposure fails if not configured"""
-    instance_pubkey = registered_environment['instance_pubkey']
-    owner_key = registered_environment['owner_key']
+    instance_pubkey = fresh_environment['instance_pubkey']
+    owner_key = fresh_environment['owner_key']
     
     with pytest.raises(requests.exceptions.HTTPError) as exc_info:
         api.expose_workload(owner_key, workload.get_expose_config(instance_pubkey))
@@ -1,65 +1,28 @@
 import pytest
 import requests
-import time
+from concurrent.futures import ThreadPoolExecutor
 
-from tests.utils.ssh import connect_with_retry
+from tests.utils.server_manager import wait_for_http
 
-def test_ssh_access_and_nginx_config(
-    registered_environment, api, workload, ssh_key_path
-):
+# All workers share the single podman container named "workload"
+pytestmark = pytest.mark.xdist_group("serial")
+
+def test_ssh_access_and_nginx_config(running_workload, http):
     """Test SSH access to container and nginx configuration"""
-    instance_pubkey = registered_environment['instance_pubkey']
-    owner_key = registered_environment['owner_key']
-    
-    # Configure and start workload
-    config = workload.get_default_config(instance_pubkey)
-    api.configure_workload(owner_key, config)
-    
-    # Verify SSH access
-    assert connect_with_retry(ssh_key_path), "Failed to establish SSH connection"
-    
-    # Configure and expose nginx
-    workload.configure_nginx()
-    api.expose_workload(owner_key, workload.get_expose_config(instance_pubkey))
-    
-    time.sleep(2)  # Wait for nginx to start
+    assert running_workload['ssh_connected'], "Failed to establish SSH connection"
     
     # Test custom location
-    response = requests.get('http://localhost:8080/custom')
+    response = http.get(running_workload['custom_url'])
     assert response.status_code == 200
     assert "Hello from custom location" in response.text
 
-def test_workload_persistence(
-    servers, registered_environment, api, workload, ssh_key_path
-):
+def test_workload_persistence(servers, running_workload, http):
     """Test that workload configuration persists across restarts"""
-    instance_pubkey = registered_environment['instance_pubkey']
-    owner_key = registered_environment['owner_key']
-    
-    # Configure and start workload
-    config = workload.get_default_config(instance_pubkey)
-    api.configure_workload(owner_key, config)
-    
-    # Verify SSH access
-    assert connect_with_retry(ssh_key_path), "Failed to establish SSH connection"
-    
-    # Configure and expose nginx
-    workload.configure_nginx()
-    api.expose_workload(owner_key, workload.get_expose_config(instance_pubkey))
-    time.sleep(2)
-    
-    # Verify initial nginx response
-    response = requests.get('http://localhost:8080/custom')
-    assert response.status_code == 200
-    assert "Hello from custom location" in response.text
-    
     # Restart servers
-    servers.stop()
-    servers.start(reset_state=False)
-    time.sleep(15)
+    servers.restart(reset_state=False)
     
     # Verify custom config persists
-    response = requests.get('http://localhost:8080/custom')
+    response = wait_for_http(running_workload['custom_url'], timeout=30, session=http)
     assert response.status_code == 200
     assert "Hello from custom location" in response.text
 
@@ -74,11 +37,24 @@ def test_directory_traversal_prevention(registered_environment, api, workload):
         "/var/log/nginx/../../etc/passwd",
     ]
 
+    configs = []
     for bad_path in bad_paths:
         config = workload.get_default_config(instance_pubkey)
         config["persist_dirs"] = [bad_path]
-        
+        configs.append(config)
+
+    # Encode and sign every payload up front
+    signed = [api.sign_payload(owner_key, config) for config in configs]
+
+    def configure(payload):
         with pytest.raises(requests.exceptions.HTTPError) as exc_info:
-            api.configure_workload(owner_key, config)
-        assert exc_info.value.response.status_code == 400
-        assert "Invalid directory path" in exc_info.value.response.json()["error"]
\ No newline at end of file
+            api.post_signed('/workload/configure', *payload)
+        return exc_info.value.response
+
+    # There is no batch endpoint, so overlap the requests instead
+    with ThreadPoolExecutor(max_workers=len(signed)) as executor:
+        responses = list(executor.map(configure, signed))
+
+    for response in responses:
+        assert response.status_code == 400
+        assert "Invalid directory path" in response.json()["error"]
\ No newline at end of file
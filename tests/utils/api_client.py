@@ -1,24 +1,41 @@
-import json
-from typing import Dict, Any
+import functools
+from typing import Dict, Any, Tuple
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from cryptography.hazmat.primitives.asymmetric import ed25519
 
+@functools.lru_cache(maxsize=64)
+def _hex_to_bytes(h: str) -> bytes:
+    return bytes.fromhex(h)
+
 class ApiClient:
     """Handles API interactions with the services"""
-    def __init__(self):
-        self.identity_url = 'http://localhost:3001'
-        self.registry_url = 'http://localhost:3000'
+    def __init__(self, identity_url: str = 'http://localhost:3001', registry_url: str = 'http://localhost:3000'):
+        self.identity_url = identity_url
+        self.registry_url = registry_url
+
+        # Reuse keepalive connections across calls, retrying idempotent requests on proxy errors
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.05, status_forcelist=[502, 503, 504], raise_on_status=False)
+        )
+        for url in [self.identity_url, self.registry_url]:
+            self.session.mount(url, adapter)
 
     def get_instance_pubkey(self) -> str:
-        response = requests.get(f'{self.identity_url}/instance/pubkey')
+        response = self.session.get(f'{self.identity_url}/instance/pubkey')
         response.raise_for_status()
         return response.json()['pubkey']
 
     def register_operator(self, instance_pubkey: str, operator_key: ed25519.Ed25519PrivateKey) -> str:
         operator_pubkey = operator_key.public_key().public_bytes_raw().hex()
-        signature = operator_key.sign(bytes.fromhex(instance_pubkey)).hex()
+        signature = operator_key.sign(_hex_to_bytes(instance_pubkey)).hex()
         
-        response = requests.post(
+        response = self.session.post(
             f'{self.identity_url}/operator/register',
             json={"pubkey": operator_pubkey, "signature": signature}
         )
@@ -27,34 +44,41 @@ class ApiClient:
 
     def register_owner(self, instance_pubkey: str, owner_key: ed25519.Ed25519PrivateKey, owner_token: str) -> None:
         owner_pubkey = owner_key.public_key().public_bytes_raw().hex()
-        signature = owner_key.sign(bytes.fromhex(instance_pubkey)).hex()
+        signature = owner_key.sign(_hex_to_bytes(instance_pubkey)).hex()
         
-        response = requests.post(
+        response = self.session.post(
             f'{self.identity_url}/owner/register',
             headers={'x-token': owner_token},
             json={"pubkey": owner_pubkey, "signature": signature}
         )
         response.raise_for_status()
 
-    def configure_workload(self, owner_key: ed25519.Ed25519PrivateKey, config: Dict[str, Any]) -> None:
-        signature = owner_key.sign(json.dumps(config).encode()).hex()
-        response = requests.post(
-            f'{self.identity_url}/workload/configure',
-            headers={'x-signature': signature},
-            json=config
+    @staticmethod
+    def sign_payload(owner_key: ed25519.Ed25519PrivateKey, config: Dict[str, Any]) -> Tuple[bytes, str]:
+        """Encode config once and sign the exact bytes that will be sent
+
+        The identity service verifies the signature over the raw body, so the
+        encoding only has to be stable, not match a server-side canonical form
+        """
+        body = orjson.dumps(config, option=orjson.OPT_SORT_KEYS)
+        return body, owner_key.sign(body).hex()
+
+    def post_signed(self, path: str, body: bytes, signature: str) -> requests.Response:
+        response = self.session.post(
+            f'{self.identity_url}{path}',
+            headers={'x-signature': signature, 'Content-Type': 'application/json'},
+            data=body
         )
         response.raise_for_status()
+        return response
+
+    def configure_workload(self, owner_key: ed25519.Ed25519PrivateKey, config: Dict[str, Any]) -> None:
+        self.post_signed('/workload/configure', *self.sign_payload(owner_key, config))
 
     def get_instance(self, instance_pubkey: str) -> Dict[str, Any]:
-        response = requests.get(f'{self.registry_url}/instance/{instance_pubkey}')
+        response = self.session.get(f'{self.registry_url}/instance/{instance_pubkey}')
         response.raise_for_status()
         return response.json()
     
     def expose_workload(self, owner_key: ed25519.Ed25519PrivateKey, config: Dict[str, Any]) -> None:
-        signature = owner_key.sign(json.dumps(config).encode()).hex()
-        response = requests.post(
-            f'{self.identity_url}/workload/expose',
-            headers={'x-signature': signature},
-            json=config
-        )
-        response.raise_for_status()
\ No newline at end of file
+        self.post_signed('/workload/expose', *self.sign_payload(owner_key, config))
\ No newline at end of file
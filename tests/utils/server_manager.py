@@ -2,48 +2,222 @@ import os
 import shutil
 import signal
 import subprocess
+import tempfile
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+RELEASE_DIR = ROOT_DIR / 'target' / 'release'
+
+# Service state lives in RAM by default, override to point at another tmpfs mount
+STATE_DIR = os.environ.get(
+    'TDX_TEST_STATE_DIR',
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+)
+
+# Shared session used for readiness probes
+_session = requests.Session()
+
+# Statuses a proxy returns while the service behind it is still starting
+NOT_READY_STATUSES = (502, 503)
+
+def wait_for_http(
+    url: str, timeout: float = 10, interval: float = 0.05, check=None, session: requests.Session = _session
+) -> requests.Response:
+    """Poll url until it answers with a status outside NOT_READY_STATUSES
+
+    check is called before every attempt and may raise to abort early
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if check is not None:
+            check()
+        # Bound each attempt so an accepted but unanswered connection can't outlive the deadline
+        remaining = max(deadline - time.monotonic(), interval)
+        try:
+            response = session.get(url, timeout=min(interval * 20, remaining))
+            if response.status_code not in NOT_READY_STATUSES:
+                return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            pass
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{url} did not become ready within {timeout}s")
+        time.sleep(interval)
+
+def prefetch(path: str) -> None:
+    """Pull a file into the page cache so the first exec doesn't stall on disk reads"""
+    with open(path, 'rb') as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            while f.read(1 << 20):
+                pass
 
 class ServerManager:
-    """Manages the lifecycle of test servers"""
-    REGISTRY_PATH = '/tmp/registry.db'
-    IDENTITY_PATH = '/tmp/identity_svc'
+    """Manages the lifecycle of test servers
+
+    Paths and ports are derived from the pytest-xdist worker id so that
+    parallel workers each get their own pair of services
+    """
+    # Populated by locate()
+    registry_bin = None
+    identity_bin = None
 
     def __init__(self):
         self.processes = {}
+        # Changes whenever the services are started or stopped
+        self.generation = 0
+        # Generation started on empty state, cleared once a test has run against it
+        self.clean_generation = None
+
+        worker = os.environ.get('PYTEST_XDIST_WORKER', 'gw0')
+        worker_idx = int(worker[2:])
+        self.registry_path = f'{STATE_DIR}/registry-{worker}.db'
+        self.identity_path = f'{STATE_DIR}/identity_svc-{worker}'
+        self.mount_path = f'/tmp/tdx-identity-persist-{worker}'
+        self.registry_port = 3000 + worker_idx * 10
+        self.identity_port = 3001 + worker_idx * 10
+        self.ssh_port = 2222 + worker_idx
+        self.workload_port = 8080 + worker_idx
+        self.registry_url = f'http://localhost:{self.registry_port}'
+        self.identity_url = f'http://localhost:{self.identity_port}'
+
+    @classmethod
+    def build(cls) -> None:
+        """Build both service binaries and pull them into the page cache"""
+        subprocess.check_call(
+            ['cargo', 'build', '--release', '--bin', 'tdx-registry', '--bin', 'identity-svc'],
+            cwd=ROOT_DIR
+        )
+        cls.locate()
+        for path in [cls.registry_bin, cls.identity_bin]:
+            prefetch(path)
+
+    @classmethod
+    def locate(cls) -> None:
+        """Remember the paths of the already built binaries"""
+        cls.registry_bin = str(RELEASE_DIR / 'tdx-registry')
+        cls.identity_bin = str(RELEASE_DIR / 'identity-svc')
 
     def start(self, reset_state: bool = True) -> None:
+        """Start both services, doing nothing if they are already running"""
+        if self.processes:
+            if all(process.poll() is None for process in self.processes.values()):
+                return
+            # A service has exited, bring both back up instead of leaving it dead
+            self.stop()
+
         if reset_state:
-            for path in [self.REGISTRY_PATH, self.IDENTITY_PATH]:
-                if os.path.exists(path):
-                    if os.path.isfile(path):
-                        os.remove(path)
-                    else:
-                        shutil.rmtree(path)
+            self._clear_state()
+        self.generation += 1
+        self.clean_generation = self.generation if reset_state else None
 
         # Start registry with TDX auth skipped
         self.processes['registry'] = subprocess.Popen(
-            ['cargo', 'run', '--bin', 'tdx-registry'],
+            [self.registry_bin],
             env={
-                **os.environ, 
+                **os.environ,
                 'SKIP_TDX_AUTH': '1',
-                'REGISTRY_DB_PATH': self.REGISTRY_PATH
-            }
+                'REGISTRY_DB_PATH': self.registry_path,
+                'REGISTRY_PORT': str(self.registry_port)
+            },
+            start_new_session=True
         )
 
-        # Start identity service (no TDX skip needed)
+        # Start identity service with attestation always mocked
         self.processes['identity'] = subprocess.Popen(
-            ['cargo', 'run', '--bin', 'identity-svc'],
+            [self.identity_bin],
             env={
                 **os.environ,
-                'STORAGE_PATH': self.IDENTITY_PATH
-            }
+                'STORAGE_PATH': self.identity_path,
+                'MOCK_ATTESTATION': '1',
+                'MOUNT_PATH': self.mount_path,
+                'GOCRYPTFS_KEY_PATH': f'{self.mount_path}.key',
+                'IDENTITY_PORT': str(self.identity_port),
+                'REGISTRY_URL': self.registry_url,
+                'SSH_PORT': str(self.ssh_port),
+                'WORKLOAD_PORT': str(self.workload_port)
+            },
+            start_new_session=True
         )
 
-        time.sleep(2)  # Wait for services to start
+        self._wait_ready()
+
+    def restart(self, reset_state: bool = True) -> None:
+        self.stop()
+        self.start(reset_state=reset_state)
+
+    def reset_state(self) -> None:
+        """Restart both services on empty state
+
+        The services keep registrations in memory and have no reload hook,
+        so clearing the files alone is not enough
+        """
+        self.restart(reset_state=True)
+
+    def ensure_clean(self) -> None:
+        """Reset unless the running services are still on untouched empty state"""
+        if self.clean_generation != self.generation:
+            self.reset_state()
+
+    def _clear_state(self) -> None:
+        for path in [self.registry_path, self.identity_path]:
+            if os.path.exists(path):
+                if os.path.isfile(path):
+                    os.remove(path)
+                else:
+                    # Move the tree out of the way and delete it in the background
+                    trash_path = f'{path}.trash-{uuid.uuid4().hex}'
+                    os.rename(path, trash_path)
+                    threading.Thread(target=shutil.rmtree, args=(trash_path, True)).start()
+
+    def _wait_ready(self, timeout: float = 30) -> None:
+        """Poll both services in parallel until they accept requests
+
+        The identity service recreates any configured workload container before it
+        starts listening, so the timeout leaves room for an image pull
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(self._wait_ready_registry, timeout),
+                executor.submit(self._wait_ready_identity, timeout)
+            ]
+            for future in futures:
+                future.result()
+
+    def _wait_ready_registry(self, timeout: float) -> None:
+        # The registry has no health route, any HTTP response means it is listening
+        wait_for_http(f'{self.registry_url}/', timeout, check=self._check_running)
+
+    def _wait_ready_identity(self, timeout: float) -> None:
+        response = wait_for_http(f'{self.identity_url}/instance/pubkey', timeout, check=self._check_running)
+        response.raise_for_status()
+
+    def _check_running(self) -> None:
+        for name, process in self.processes.items():
+            if process.poll() is not None:
+                raise RuntimeError(f"{name} exited with code {process.returncode}")
 
     def stop(self) -> None:
-        for process in self.processes.values():
-            process.send_signal(signal.SIGINT)
+        self.generation += 1
+        with ThreadPoolExecutor(max_workers=len(self.processes) or 1) as executor:
+            list(executor.map(self._terminate, self.processes.values()))
+        self.processes.clear()
+
+    @staticmethod
+    def _terminate(process: subprocess.Popen, timeout: float = 1.0) -> None:
+        """Terminate the process group, escalating to SIGKILL if it doesn't exit in time"""
+        # Each service is started in its own session, so its pgid is its pid
+        pgid = process.pid
+        try:
+            os.killpg(pgid, signal.SIGTERM)
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(pgid, signal.SIGKILL)
+            process.wait()
+        except ProcessLookupError:
             process.wait()
-        self.processes.clear()
\ No newline at end of file
@@ -1,8 +1,26 @@
+import socket
 import time
 import paramiko
 from pathlib import Path
 
-def connect_with_retry(key_path: Path, max_retries: int = 5, delay: int = 2) -> bool:
+def tcp_ssh_ready(port: int = 2222, timeout: float = 5, interval: float = 0.05) -> bool:
+    """Check that an SSH server is accepting connections by reading its banner
+
+    Much cheaper than a full handshake, but does not authenticate
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(('localhost', port), timeout=timeout) as s:
+                if s.recv(32).startswith(b'SSH-'):
+                    return True
+        except OSError:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
+def connect_with_retry(key_path: Path, port: int = 2222, max_retries: int = 5, delay: int = 2) -> bool:
     """Attempt SSH connection with retries"""
     ssh = paramiko.SSHClient()
     ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -11,7 +29,7 @@ def connect_with_retry(key_path: Path, max_retries: int = 5, delay: int = 2) ->
         try:
             ssh.connect(
                 'localhost',
-                port=2222,
+                port=port,
                 username='root',
                 key_filename=str(key_path),
                 timeout=5
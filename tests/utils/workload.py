@@ -1,5 +1,8 @@
+import functools
+import os
 from pathlib import Path
 from base64 import b64encode
+from typing import Tuple
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import serialization
 
@@ -26,27 +29,29 @@ class WorkloadManager:
         "port": 80
     }
 
+    def __init__(self, persist_path: str = '/tmp/tdx-identity-persist'):
+        self.persist_path = persist_path
+
     @staticmethod
     def setup_ssh_config(ssh_dir: Path, owner_key: ed25519.Ed25519PrivateKey) -> Path:
         """Create SSH key files and return path to private key"""
         ssh_dir.mkdir(mode=0o700, exist_ok=True)
         
         key_path = ssh_dir / "test_key"
-        
-        # Save private key
-        key_bytes = owner_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.OpenSSH,
+        seed = owner_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
             encryption_algorithm=serialization.NoEncryption()
         )
+        key_bytes, pub_key = _serialize_ed25519(seed)
+        
+        # Save private key
         key_path.write_bytes(key_bytes)
         key_path.chmod(0o600)
         
         # Save public key
         pub_key_path = key_path.with_suffix('.pub')
-        pub_key_path.write_text(WorkloadManager.ed25519_to_ssh_public_key(
-            owner_key.public_key().public_bytes_raw()
-        ))
+        pub_key_path.write_text(pub_key)
         pub_key_path.chmod(0o644)
         
         return key_path
@@ -64,12 +69,18 @@ class WorkloadManager:
         key_blob = b''.join(key_parts)
         return f"{key_type} {b64encode(key_blob).decode()}"
 
-    @staticmethod
-    def configure_nginx():
-        """Configure nginx by writing custom config"""
-        path = "/tmp/tdx-identity-persist/podman/etc/nginx/conf.d/default.conf"
-        with open(path, "w") as f:
+    def configure_nginx(self):
+        """Configure nginx by writing custom config
+
+        The config is picked up when exposing the workload recreates the container,
+        so no reload is needed. The file is swapped in atomically so nginx never
+        reads a partial config
+        """
+        path = f"{self.persist_path}/podman/etc/nginx/conf.d/default.conf"
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
             f.write(WorkloadManager.NGINX_CONFIG)
+        os.replace(tmp_path, path)
 
     @staticmethod
     def get_default_config(instance_pubkey):
@@ -85,4 +96,16 @@ class WorkloadManager:
         return {
             "instance_pubkey": instance_pubkey,
             "image": WorkloadManager.DEFAULT_CONFIG["image"]
-        }
\ No newline at end of file
+        }
+
+@functools.lru_cache(maxsize=128)
+def _serialize_ed25519(seed: bytes) -> Tuple[bytes, str]:
+    """Serialize a raw 32-byte Ed25519 seed to OpenSSH private key and public key contents"""
+    owner_key = ed25519.Ed25519PrivateKey.from_private_bytes(seed)
+    key_bytes = owner_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.OpenSSH,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    pub_key = WorkloadManager.ed25519_to_ssh_public_key(owner_key.public_key().public_bytes_raw())
+    return key_bytes, pub_key